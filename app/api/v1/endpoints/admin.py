@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from typing import Dict, Any, List
 
+from app.core.cache import invalidate_user_cache
 from app.core.deps import get_admin_user
 from app.services.supabase_service import supabase_service
 
@@ -33,6 +34,7 @@ async def modify_user_subscription(
     admin_user: Dict[str, Any] = Depends(get_admin_user)
 ):
     """Modify user subscription (admin only)"""
+    await invalidate_user_cache(user_id)
     return {
         "message": f"Admin endpoint - modify subscription for user {user_id}",
         "note": "Implement subscription management for customer support"
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Dict, Any
 from pydantic import BaseModel, EmailStr
 
+from app.core.cache import cached_response, invalidate_user_cache
 from app.core.deps import get_current_active_user
 from app.services.supabase_service import supabase_service
 
@@ -36,6 +37,7 @@ async def login(login_data: LoginRequest):
     }
 
 @router.get("/profile")
+@cached_response("auth:profile")
 async def get_profile(current_user: Dict[str, Any] = Depends(get_current_active_user)):
     """Get current user profile"""
     return {
@@ -51,4 +53,5 @@ async def update_profile(
     current_user: Dict[str, Any] = Depends(get_current_active_user)
 ):
     """Update user profile"""
+    await invalidate_user_cache(current_user["id"])
     return {"message": "Profile update endpoint - implement based on your needs"}
\ No newline at end of file
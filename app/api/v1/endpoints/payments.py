@@ -3,6 +3,7 @@ from fastapi.responses import JSONResponse
 from typing import Dict, Any
 from pydantic import BaseModel
 
+from app.core.cache import cached_response, invalidate_user_cache
 from app.core.deps import get_current_active_user
 from app.services.stripe_service import stripe_service
 from app.services.supabase_service import supabase_service
@@ -10,6 +11,15 @@ from app.models.response import MessageResponse
 
 router = APIRouter()
 
+SUBSCRIPTION_EVENTS = {
+    "checkout.session.completed",
+    "customer.subscription.created",
+    "customer.subscription.updated",
+    "customer.subscription.deleted",
+    "invoice.payment_succeeded",
+    "invoice.payment_failed",
+}
+
 class CreateSubscriptionRequest(BaseModel):
     price_id: str
 
@@ -44,6 +54,7 @@ async def cancel_subscription(
     return MessageResponse(message="Subscription cancellation endpoint")
 
 @router.get("/subscription-status")
+@cached_response("payments:subscription-status")
 async def get_subscription_status(
     current_user: Dict[str, Any] = Depends(get_current_active_user)
 ):
@@ -61,8 +72,15 @@ async def stripe_webhook(request: Request):
     try:
         payload = await request.body()
         signature = request.headers.get("stripe-signature")
-        
-        return JSONResponse(content={"status": "webhook received"})
-        
+        event = stripe_service.construct_event(payload, signature)
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Subscription changes land here, so drop the user's cached profile and
+    # responses to stop serving the old plan
+    if event["type"] in SUBSCRIPTION_EVENTS:
+        user_id = await stripe_service.get_event_user_id(event)
+        if user_id:
+            await invalidate_user_cache(user_id)
+    
+    return JSONResponse(content={"status": "webhook received"})
\ No newline at end of file
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+import hashlib
+from fastapi import APIRouter, Depends, Request
 from typing import Dict, Any
 
-from app.core.deps import get_current_active_user, get_premium_user
+from app.core.cache import cached_response
+from app.core.deps import get_current_active_user, get_premium_user, skip_concurrency_feedback
 from app.models.response import MessageResponse
+from app.services.usage_service import usage_service
 
 router = APIRouter()
 
@@ -18,6 +21,7 @@ async def free_feature(
     }
 
 @router.get("/premium-feature")
+@cached_response("protected:premium-feature")
 async def premium_feature(
     current_user: Dict[str, Any] = Depends(get_premium_user)
 ):
@@ -28,25 +32,48 @@ async def premium_feature(
         "premium_data": "Advanced analytics, unlimited API calls, priority support"
     }
 
-@router.post("/usage-tracked-feature")
+@router.post(
+    "/usage-tracked-feature",
+    dependencies=[Depends(skip_concurrency_feedback)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/octet-stream": {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
 async def usage_tracked_feature(
-    data: Dict[str, Any],
+    request: Request,
     current_user: Dict[str, Any] = Depends(get_current_active_user)
 ):
     """Feature that tracks usage for metered billing"""
     
-    # Process the request
-    result = {"processed": True, "input_data": data}
+    # Process the request body incrementally as it streams in
+    digest = hashlib.sha256()
+    bytes_processed = 0
+    async for chunk in usage_service.stream_metered_body(request, current_user):
+        digest.update(chunk)
+        bytes_processed += len(chunk)
     
-    # Track usage (placeholder for now)
+    result = {
+        "processed": True,
+        "bytes_processed": bytes_processed,
+        "sha256": digest.hexdigest()
+    }
+    
+    # Track data processing usage for metered billing
+    recorded = await usage_service.record_data_processing(
+        current_user["id"], bytes_processed, endpoint=request.url.path
+    )
     usage_info = {
         "user_id": current_user["id"],
         "feature": "usage_tracked_feature", 
         "units_consumed": 1,
-        "note": "Usage tracking will be implemented with Stripe metered billing"
+        "data_processed_bytes": bytes_processed,
+        "recorded": recorded
     }
     
     return {
         "result": result,
         "usage": usage_info
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,252 @@
+import functools
+import hashlib
+import inspect
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Set, Tuple
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.redis_client import RedisConnection, hash_tag_key
+
+logger = get_logger(__name__)
+
+class TieredCache:
+    """In-memory LRU in front of an optional shared Redis tier.
+
+    Reads are served from memory whenever possible, so a warm entry costs no
+    I/O; Redis is consulted only on a memory miss and is skipped while its
+    node's circuit breaker is open. Values stored in Redis must be JSON
+    serializable.
+
+    Deleting an entry clears this worker's memory and Redis, but other
+    workers may keep serving their in-memory copy for up to ``memory_ttl``.
+    """
+    def __init__(self, ttl: int, memory_ttl: int, max_entries: int):
+        self.ttl = ttl
+        self.memory_ttl = memory_ttl
+        self.max_entries = max_entries
+        self.redis: Optional[RedisConnection] = None
+        self._memory: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def attach_redis(self, redis: Optional[RedisConnection]) -> None:
+        """Enable the shared Redis tier"""
+        self.redis = redis
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value, checking memory before Redis"""
+        value = self.peek(key)
+        if value is not None:
+            return value
+
+        redis_client = self.redis.for_key(key) if self.redis else None
+        if not redis_client:
+            return None
+
+        try:
+            raw = redis_client.get(key)
+        except Exception as e:
+            logger.warning("Cache error: %s", e)
+            self.redis.record_failure(key)
+            return None
+
+        if raw is None:
+            return None
+
+        value = json.loads(raw)
+        self._remember(key, value, self.memory_ttl)
+        return value
+
+    def peek(self, key: str) -> Optional[Any]:
+        """Return the value from memory only, without any I/O"""
+        entry = self._memory.get(key)
+        if not entry:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self._memory.pop(key, None)
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        """Store a value in both tiers"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        self._remember(key, value, min(ttl, self.memory_ttl))
+
+        redis_client = self.redis.for_key(key) if self.redis else None
+        if not redis_client:
+            return
+
+        try:
+            redis_client.set(key, json.dumps(value, default=str), ex=ttl)
+        except Exception as e:
+            logger.warning("Cache error: %s", e)
+            self.redis.record_failure(key)
+
+    def delete(self, *keys: str) -> None:
+        """Drop entries from both tiers (keys must share a hash tag)"""
+        for key in keys:
+            self._memory.pop(key, None)
+
+        redis_client = self.redis.for_key(keys[0]) if self.redis and keys else None
+        if not redis_client:
+            return
+
+        try:
+            redis_client.delete(*keys)
+        except Exception as e:
+            logger.warning("Cache error: %s", e)
+            self.redis.record_failure(keys[0])
+
+    def clear(self) -> None:
+        """Drop every in-memory entry"""
+        self._memory.clear()
+
+    def _remember(self, key: str, value: Any, ttl: int) -> None:
+        if ttl <= 0:
+            return
+        self._memory[key] = (time.monotonic() + ttl, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+# Token -> Supabase user and user id -> profile, replacing the two Supabase
+# round trips every authenticated request would otherwise make
+token_cache = TieredCache(
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    memory_ttl=settings.RESPONSE_CACHE_MEMORY_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
+profile_cache = TieredCache(
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    memory_ttl=settings.RESPONSE_CACHE_MEMORY_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
+# Token -> plan, read before authentication to prioritise admission. Kept in
+# memory for the whole auth TTL since it only decides queue priority
+admission_cache = TieredCache(
+    ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    memory_ttl=settings.AUTH_CACHE_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
+# Rendered (body, etag) pairs; ETags are content hashes, so they match
+# across workers and after an entry is rebuilt
+response_cache = TieredCache(
+    ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    memory_ttl=settings.RESPONSE_CACHE_MEMORY_TTL_SECONDS,
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+)
+_response_namespaces: Set[str] = set()
+
+def attach_cache_redis(redis: Optional[RedisConnection]) -> None:
+    """Enable the shared Redis tier for the auth, profile and response caches"""
+    token_cache.attach_redis(redis)
+    profile_cache.attach_redis(redis)
+    admission_cache.attach_redis(redis)
+    response_cache.attach_redis(redis)
+
+def token_cache_key(token: str) -> str:
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return hash_tag_key("auth_token", digest)
+
+def admission_cache_key(token: str) -> str:
+    digest = hashlib.sha256(token.encode("utf-8")).hexdigest()
+    return hash_tag_key("admission_plan", digest)
+
+def profile_cache_key(user_id: str) -> str:
+    return hash_tag_key("user_profile", user_id)
+
+def response_cache_key(user_id: str, namespace: str) -> str:
+    return hash_tag_key("response_cache", user_id, namespace)
+
+async def invalidate_user_cache(user_id: str) -> None:
+    """Drop a user's cached profile and responses after they change"""
+    profile_cache.delete(profile_cache_key(user_id))
+    response_cache.delete(*[
+        response_cache_key(user_id, namespace) for namespace in _response_namespaces
+    ])
+
+def compute_etag(body: str) -> str:
+    """Strong ETag derived from the serialized body"""
+    return '"' + hashlib.sha256(body.encode("utf-8")).hexdigest()[:32] + '"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+def _build_response(request: Request, body: str, etag: str, cache_status: str) -> Response:
+    # Clients must revalidate every time so an invalidation is seen at once;
+    # an unchanged response still costs them only a 304
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+        "X-Cache": cache_status,
+    }
+    if _etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def cached_response(
+    namespace: str,
+    ttl: Optional[int] = None,
+    user_param: str = "current_user",
+) -> Callable:
+    """Cache an authenticated GET endpoint's JSON response per user.
+
+    The decorated endpoint must take the authenticated user (as returned by
+    the dependencies in app.core.deps) in the ``user_param`` argument.
+    Responses are kept for ``ttl`` seconds (RESPONSE_CACHE_TTL_SECONDS by
+    default) in Redis and for at most RESPONSE_CACHE_MEMORY_TTL_SECONDS in
+    memory. They carry an ETag, and matching ``If-None-Match`` requests are
+    answered with 304 without running the handler.
+    """
+    cache_ttl = ttl if ttl is not None else settings.RESPONSE_CACHE_TTL_SECONDS
+    _response_namespaces.add(namespace)
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        inject_request = "request" not in signature.parameters
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            request: Request = kwargs.pop("request") if inject_request else kwargs["request"]
+            current_user: Dict[str, Any] = kwargs[user_param]
+
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            key = response_cache_key(current_user["id"], namespace)
+            cached = response_cache.get(key)
+            if cached:
+                body, etag = cached
+                return _build_response(request, body, etag, "HIT")
+
+            result = await func(*args, **kwargs)
+            if isinstance(result, Response):
+                return result
+
+            body = json.dumps(jsonable_encoder(result), separators=(",", ":"))
+            etag = compute_etag(body)
+            response_cache.set(key, (body, etag), cache_ttl)
+            return _build_response(request, body, etag, "MISS")
+
+        if inject_request:
+            parameters = list(signature.parameters.values())
+            parameters.append(
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            )
+            wrapper.__signature__ = signature.replace(parameters=parameters)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,166 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, NamedTuple
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError
+from app.core.logger import get_logger
+from app.models.subscription import SubscriptionPlan
+
+logger = get_logger(__name__)
+
+class PlanAdmission(NamedTuple):
+    priority: int  # lower is served first
+    capacity_share: float  # fraction of the concurrency limit the plan may occupy
+    max_queue: int  # waiters allowed before new requests are shed
+
+PLAN_ADMISSION: Dict[SubscriptionPlan, PlanAdmission] = {
+    SubscriptionPlan.ENTERPRISE: PlanAdmission(priority=0, capacity_share=1.0, max_queue=200),
+    SubscriptionPlan.PREMIUM: PlanAdmission(priority=1, capacity_share=1.0, max_queue=100),
+    SubscriptionPlan.BASIC: PlanAdmission(priority=2, capacity_share=0.8, max_queue=25),
+    SubscriptionPlan.FREE: PlanAdmission(priority=3, capacity_share=0.6, max_queue=5),
+}
+
+class ConcurrencyTicket:
+    """A held slot; clear ``adaptive`` to keep its latency out of the feedback"""
+    def __init__(self):
+        self.adaptive = True
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limiter with per-plan priority queues.
+
+    The limit grows by roughly one per window of fast requests and shrinks
+    multiplicatively when a request is slower than the target latency or
+    fails. Free and basic plans may only use part of the limit, so capacity is
+    always left for paying plans, and their short queues shed load first.
+    """
+    def __init__(
+        self,
+        initial_limit: int,
+        min_limit: int,
+        max_limit: int,
+        target_latency: float,
+        backoff: float,
+        max_wait: float,
+        retry_after: int,
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._plans = sorted(PLAN_ADMISSION, key=lambda plan: PLAN_ADMISSION[plan].priority)
+        self._queues: Dict[SubscriptionPlan, Deque[asyncio.Future]] = {
+            plan: deque() for plan in self._plans
+        }
+
+    @asynccontextmanager
+    async def slot(self, plan: SubscriptionPlan) -> AsyncIterator[ConcurrencyTicket]:
+        """Hold a concurrency slot for the duration of the block"""
+        await self.acquire(plan)
+        ticket = ConcurrencyTicket()
+        start = time.monotonic()
+        failed = False
+        try:
+            yield ticket
+        except HTTPException:
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(time.monotonic() - start, failed, adaptive=ticket.adaptive)
+
+    async def acquire(self, plan: SubscriptionPlan) -> None:
+        """Wait for a slot, or raise ServiceUnavailableError if shed"""
+        admission = PLAN_ADMISSION[plan]
+        if self.in_flight < self._capacity(plan) and not self._has_waiters(admission.priority):
+            self.in_flight += 1
+            return
+
+        queue = self._queues[plan]
+        if len(queue) >= admission.max_queue:
+            raise self._shed(plan)
+
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was granted as the wait ended; hand it to the next waiter
+                self.in_flight -= 1
+                self._dispatch()
+            elif waiter in queue:
+                queue.remove(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._shed(plan)
+            raise
+
+    def release(self, latency: float, failed: bool = False, adaptive: bool = True) -> None:
+        """Free a slot and, if ``adaptive``, adapt the limit to the observed latency"""
+        self.in_flight -= 1
+        if adaptive:
+            self._adjust(latency, failed)
+        self._dispatch()
+
+    def _adjust(self, latency: float, failed: bool) -> None:
+        now = time.monotonic()
+        if failed or latency > self.target_latency:
+            # Back off at most once per target latency to avoid collapsing on a burst
+            if now - self._last_decrease >= self.target_latency:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._last_decrease = now
+        else:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def _dispatch(self) -> None:
+        for plan in self._plans:
+            queue = self._queues[plan]
+            while queue and self.in_flight < self._capacity(plan):
+                waiter = queue.popleft()
+                if waiter.done():
+                    continue
+                waiter.set_result(None)
+                self.in_flight += 1
+            if queue:
+                # Never let lower priority plans overtake queued higher ones
+                return
+
+    def _capacity(self, plan: SubscriptionPlan) -> int:
+        return max(1, int(self.limit * PLAN_ADMISSION[plan].capacity_share))
+
+    def _has_waiters(self, priority: int) -> bool:
+        return any(
+            self._queues[plan] for plan in self._plans
+            if PLAN_ADMISSION[plan].priority <= priority
+        )
+
+    def _shed(self, plan: SubscriptionPlan) -> ServiceUnavailableError:
+        logger.warning(
+            "Shedding %s request",
+            plan.value,
+            extra={"concurrency_limit": int(self.limit), "in_flight": self.in_flight},
+        )
+        return ServiceUnavailableError(
+            detail="Server is at capacity, please retry shortly",
+            retry_after=self.retry_after,
+        )
+
+concurrency_limiter = AdaptiveConcurrencyLimiter(
+    initial_limit=settings.CONCURRENCY_INITIAL_LIMIT,
+    min_limit=settings.CONCURRENCY_MIN_LIMIT,
+    max_limit=settings.CONCURRENCY_MAX_LIMIT,
+    target_latency=settings.CONCURRENCY_TARGET_LATENCY_SECONDS,
+    backoff=settings.CONCURRENCY_BACKOFF_RATIO,
+    max_wait=settings.CONCURRENCY_MAX_WAIT_SECONDS,
+    retry_after=settings.CONCURRENCY_RETRY_AFTER_SECONDS,
+)
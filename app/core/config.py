@@ -10,6 +10,7 @@ class Settings(BaseSettings):
     SUPABASE_URL: str = ""
     SUPABASE_KEY: str = ""
     SUPABASE_SERVICE_KEY: str = ""
+    SUPABASE_JWT_SECRET: str = ""
     
     # Stripe settings
     STRIPE_SECRET_KEY: str = ""
@@ -18,12 +19,45 @@ class Settings(BaseSettings):
     
     # Redis settings
     REDIS_URL: str = "redis://localhost:6379"
+    REDIS_CLUSTER_MODE: bool = False
+    REDIS_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT_SECONDS: float = 0.5
+    REDIS_RETRY_SECONDS: int = 5
     
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8080"]
     
     # Rate limiting
     RATE_LIMIT_PER_MINUTE: int = 60
+    RATE_LIMIT_LOCAL_FALLBACK: bool = False
+    
+    # Concurrency control / load shedding
+    CONCURRENCY_LIMIT_ENABLED: bool = True
+    CONCURRENCY_INITIAL_LIMIT: int = 20
+    CONCURRENCY_MIN_LIMIT: int = 5
+    CONCURRENCY_MAX_LIMIT: int = 200
+    CONCURRENCY_TARGET_LATENCY_SECONDS: float = 1.0
+    CONCURRENCY_BACKOFF_RATIO: float = 0.9
+    CONCURRENCY_MAX_WAIT_SECONDS: float = 2.0
+    CONCURRENCY_RETRY_AFTER_SECONDS: int = 2
+    
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = True
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_RATE_LIMIT_WINDOW_SECONDS: int = 60
+    LOG_RATE_LIMIT_BURST: int = 5
+    
+    # Data processing metering
+    DATA_PROCESSING_MAX_PAYLOAD_MB: int = 100
+    DATA_PROCESSING_FAIL_OPEN: bool = False
+    
+    # Response caching
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MEMORY_TTL_SECONDS: int = 5
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
     
     class Config:
         env_file = ".env"
@@ -1,16 +1,94 @@
-from fastapi import Depends, HTTPException, status
+import time
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from typing import Dict, Any, Optional
+from jose import jwt
+from typing import AsyncIterator, Dict, Any, Optional
+from app.core.cache import (
+    admission_cache,
+    admission_cache_key,
+    profile_cache,
+    profile_cache_key,
+    token_cache,
+    token_cache_key,
+)
+from app.core.concurrency import concurrency_limiter
+from app.core.config import settings
+from app.models.subscription import SubscriptionPlan, plan_from_profile
 from app.services.supabase_service import supabase_service
 
 security = HTTPBearer()
 
+def token_cache_ttl(token: str) -> int:
+    """Cache lifetime for a verified token, never past its expiry"""
+    try:
+        expires_at = jwt.get_unverified_claims(token).get("exp")
+    except Exception:
+        return 0
+    if expires_at is None:
+        return settings.AUTH_CACHE_TTL_SECONDS
+    return min(settings.AUTH_CACHE_TTL_SECONDS, int(expires_at - time.time()))
+
+def admission_plan(token: str) -> SubscriptionPlan:
+    """Plan used to admit a request before it is authenticated.
+
+    Taken from the verified ``app_metadata.subscription_plan`` claim when
+    ``SUPABASE_JWT_SECRET`` is set, otherwise from the plan recorded for the
+    token by an earlier request (memory, then Redis). Unknown callers are
+    admitted as free users. Supabase is never called, so a flood of requests
+    cannot reach it ahead of the limiter.
+    """
+    if settings.SUPABASE_JWT_SECRET:
+        try:
+            claims = jwt.decode(
+                token,
+                settings.SUPABASE_JWT_SECRET,
+                algorithms=["HS256"],
+                options={"verify_aud": False},
+            )
+            return SubscriptionPlan(claims["app_metadata"]["subscription_plan"])
+        except Exception:
+            pass
+
+    plan = admission_cache.get(admission_cache_key(token))
+    return SubscriptionPlan(plan) if plan else SubscriptionPlan.FREE
+
+def skip_concurrency_feedback(request: Request) -> None:
+    """Keep a route's latency out of the adaptive concurrency limit.
+
+    For endpoints whose duration is bound by the client, such as streamed
+    uploads, where a slow request says nothing about server load.
+    """
+    request.state.skip_concurrency_feedback = True
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> Dict[str, Any]:
-    """Get current authenticated user"""
+) -> AsyncIterator[Dict[str, Any]]:
+    """Get current authenticated user.
+
+    The request holds a concurrency slot, prioritised by subscription plan,
+    from before authentication until the endpoint finishes.
+    """
     token = credentials.credentials
-    user_data = await supabase_service.verify_token(token)
+    if not settings.CONCURRENCY_LIMIT_ENABLED:
+        yield await authenticate(token)
+        return
+
+    async with concurrency_limiter.slot(admission_plan(token)) as ticket:
+        try:
+            yield await authenticate(token)
+        finally:
+            ticket.adaptive = not getattr(request.state, "skip_concurrency_feedback", False)
+
+async def authenticate(token: str) -> Dict[str, Any]:
+    """Resolve a bearer token to its Supabase user"""
+    cache_key = token_cache_key(token)
+    user_data = token_cache.get(cache_key)
+    
+    if user_data is None:
+        user_data = await supabase_service.verify_token(token)
+        if user_data:
+            token_cache.set(cache_key, user_data, token_cache_ttl(token))
     
     if not user_data:
         raise HTTPException(
@@ -22,10 +100,16 @@ async def get_current_user(
     return user_data
 
 async def get_current_active_user(
-    current_user: Dict[str, Any] = Depends(get_current_user)
+    current_user: Dict[str, Any] = Depends(get_current_user),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
 ) -> Dict[str, Any]:
     """Get current active user with profile"""
-    profile = await supabase_service.get_user_profile(current_user["id"])
+    cache_key = profile_cache_key(current_user["id"])
+    profile = profile_cache.get(cache_key)
+    if profile is None:
+        profile = await supabase_service.get_user_profile(current_user["id"])
+        if profile:
+            profile_cache.set(cache_key, profile)
     
     if not profile or not profile.get("is_active", True):
         raise HTTPException(
@@ -33,6 +117,12 @@ async def get_current_active_user(
             detail="Inactive user"
         )
     
+    # Remember the plan so the token's next request is admitted at its priority
+    plan = plan_from_profile(profile).value
+    hint_key = admission_cache_key(credentials.credentials)
+    if admission_cache.peek(hint_key) != plan:
+        admission_cache.set(hint_key, plan, token_cache_ttl(credentials.credentials))
+    
     return {**current_user, "profile": profile}
 
 async def get_premium_user(
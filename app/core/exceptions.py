@@ -1,6 +1,18 @@
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
 from typing import Any, Dict, Optional
 
+def internal_error_response(request: Request) -> JSONResponse:
+    """Body returned for unhandled exceptions"""
+    return JSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={
+            "error": "Internal server error",
+            "error_code": "INTERNAL_ERROR",
+            "path": str(request.url.path)
+        }
+    )
+
 class CustomException(HTTPException):
     """Base custom exception class"""
     def __init__(
@@ -59,6 +71,15 @@ class PaymentError(CustomException):
             error_code="PAYMENT_ERROR"
         )
 
+class PayloadTooLargeError(CustomException):
+    """Request payload size errors"""
+    def __init__(self, detail: str = "Request payload too large"):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=detail,
+            error_code="PAYLOAD_TOO_LARGE"
+        )
+
 class ValidationError(CustomException):
     """Data validation errors"""
     def __init__(self, detail: str = "Validation failed"):
@@ -79,9 +100,14 @@ class NotFoundError(CustomException):
 
 class ServiceUnavailableError(CustomException):
     """Service unavailable errors"""
-    def __init__(self, detail: str = "Service temporarily unavailable"):
+    def __init__(
+        self,
+        detail: str = "Service temporarily unavailable",
+        retry_after: Optional[int] = None,
+    ):
         super().__init__(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=detail,
-            error_code="SERVICE_UNAVAILABLE"
+            error_code="SERVICE_UNAVAILABLE",
+            headers={"Retry-After": str(retry_after)} if retry_after is not None else None
         )
\ No newline at end of file
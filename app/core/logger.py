@@ -0,0 +1,160 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+
+request_id_ctx: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+correlation_id_ctx: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("correlation_id", default=None)
+
+# Attributes present on every LogRecord; anything else was passed via ``extra``
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+class ContextFilter(logging.Filter):
+    """Attach the current request and correlation IDs to each record"""
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_ctx.get()
+        record.correlation_id = correlation_id_ctx.get()
+        return True
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most ``burst`` identical records per ``window`` seconds.
+
+    Records are grouped by logger, level and unformatted message, so calls
+    should pass variable data as arguments rather than pre-formatting it.
+    The first record after a suppressed window reports how many were dropped.
+    """
+    def __init__(self, window: float, burst: int, min_level: int = logging.WARNING):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self.min_level = min_level
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, int, Any], list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < self.min_level or self.burst <= 0:
+            return True
+
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or now - bucket[0] >= self.window:
+                suppressed = bucket[2] if bucket else 0
+                self._buckets[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+
+            if bucket[1] < self.burst:
+                bucket[1] += 1
+                return True
+
+            bucket[2] += 1
+            return False
+
+class JSONFormatter(logging.Formatter):
+    """Render records as single-line JSON objects"""
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and value is not None:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that never blocks the caller and drops records when full.
+
+    The number of records dropped is reported as ``dropped_records`` on the
+    next record that makes it onto the queue.
+    """
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render the message here so the listener thread never touches
+        # caller-owned arguments, but keep extras for the JSON formatter.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        dropped = self.dropped
+        if dropped:
+            record.dropped_records = dropped
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if dropped:
+            self.dropped -= dropped
+
+_listener: Optional[QueueListener] = None
+
+def setup_logging() -> None:
+    """Route the ``app`` logger through a background queue listener"""
+    global _listener
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler()
+    if settings.LOG_JSON:
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter(
+            "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"
+        ))
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    handler = NonBlockingQueueHandler(log_queue)
+    handler.addFilter(ContextFilter())
+    handler.addFilter(RateLimitFilter(
+        window=settings.LOG_RATE_LIMIT_WINDOW_SECONDS,
+        burst=settings.LOG_RATE_LIMIT_BURST,
+    ))
+
+    app_logger = logging.getLogger("app")
+    app_logger.setLevel(settings.LOG_LEVEL.upper())
+    app_logger.handlers = [handler]
+    app_logger.propagate = False
+
+    _listener = QueueListener(log_queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def get_logger(name: str) -> logging.Logger:
+    """Return a logger under the ``app`` namespace"""
+    if name != "app" and not name.startswith("app."):
+        name = f"app.{name}"
+    return logging.getLogger(name)
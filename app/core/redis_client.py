@@ -0,0 +1,115 @@
+import time
+import redis
+from redis.cluster import RedisCluster
+from redis.crc import key_slot
+from typing import Callable, Dict, Optional, Union
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+RedisClient = Union[redis.Redis, RedisCluster]
+
+def create_redis_client() -> RedisClient:
+    """Create a pooled Redis client, cluster-aware when REDIS_CLUSTER_MODE is set"""
+    if settings.REDIS_CLUSTER_MODE:
+        return RedisCluster.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        )
+
+    pool = redis.ConnectionPool.from_url(
+        settings.REDIS_URL,
+        decode_responses=True,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT_SECONDS,
+    )
+    return redis.Redis(connection_pool=pool)
+
+def hash_tag_key(prefix: str, tag: str, *parts: str) -> str:
+    """Build a key whose slot is decided by ``tag`` alone.
+
+    Redis Cluster only hashes the text inside the first ``{...}``, so every key
+    sharing a tag lands on the same slot and multi-key commands stay valid.
+    """
+    tag = tag.replace("{", "").replace("}", "")
+    return ":".join([prefix, f"{{{tag}}}", *parts])
+
+class RedisConnection:
+    """Lazily built Redis client with a per-node circuit breaker.
+
+    A plain Redis pool connects on first use, and a cluster client whose seed
+    nodes are unreachable is rebuilt after ``retry_seconds``, so Redis being
+    down at startup is not permanent. Failures trip only the node (or, before
+    the cluster's slot map is known, the slot) that owns the failing key, so
+    one unreachable shard degrades just the keys it serves.
+    """
+    def __init__(
+        self,
+        factory: Callable[[], RedisClient] = create_redis_client,
+        retry_seconds: float = settings.REDIS_RETRY_SECONDS,
+    ):
+        self.factory = factory
+        self.retry_seconds = retry_seconds
+        self._client: Optional[RedisClient] = None
+        self._client_retry_at = 0.0
+        self._unavailable_until: Dict[str, float] = {}
+
+    @property
+    def client(self) -> Optional[RedisClient]:
+        """The shared client, building it if due"""
+        if self._client is None and time.monotonic() >= self._client_retry_at:
+            try:
+                self._client = self.factory()
+            except Exception as e:
+                logger.warning("Redis client creation failed: %s", e)
+                self._client_retry_at = time.monotonic() + self.retry_seconds
+        return self._client
+
+    def node_for_key(self, key: str) -> str:
+        """Identify the node serving ``key`` for circuit breaking"""
+        get_node = getattr(self._client, "get_node_from_key", None)
+        if get_node is None:
+            return "default"
+        try:
+            return get_node(key).name
+        except Exception:
+            return f"slot:{key_slot(key.encode('utf-8'))}"
+
+    def for_key(self, key: str) -> Optional[RedisClient]:
+        """Client to use for ``key``, or None while its node is tripped"""
+        client = self.client
+        if client is None:
+            return None
+
+        node = self.node_for_key(key)
+        unavailable_until = self._unavailable_until.get(node)
+        if unavailable_until is not None:
+            if time.monotonic() < unavailable_until:
+                return None
+            del self._unavailable_until[node]
+        return client
+
+    def record_failure(self, key: str) -> None:
+        """Stop using the node serving ``key`` for ``retry_seconds``"""
+        self._unavailable_until[self.node_for_key(key)] = time.monotonic() + self.retry_seconds
+
+    def ping(self) -> bool:
+        """Whether Redis currently answers"""
+        client = self.client
+        if client is None:
+            return False
+        try:
+            return bool(client.ping())
+        except Exception:
+            return False
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+            self._client = None
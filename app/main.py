@@ -3,36 +3,46 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
-import redis
-from typing import Optional
 
 from app.core.config import settings
+from app.core.logger import get_logger, setup_logging, shutdown_logging
+from app.core.redis_client import RedisConnection
 from app.api.v1.router import api_router
-from app.core.exceptions import CustomException
+from app.core.cache import attach_cache_redis
+from app.core.exceptions import CustomException, internal_error_response
 from app.middleware.rate_limiting import RateLimitMiddleware
+from app.middleware.request_context import RequestContextMiddleware
 
-# Redis client setup (optional for development)
-redis_client: Optional[redis.Redis] = None
-try:
-    redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
-    # Test connection
-    redis_client.ping()
-    print(f"Connected to Redis at {settings.REDIS_URL}")
-except Exception as e:
-    print(f"Redis connection failed: {e}. Rate limiting will be disabled.")
-    redis_client = None
+setup_logging()
+logger = get_logger(__name__)
+
+# Redis client setup (optional for development). The client connects lazily
+# and retries on its own, so a Redis outage at startup is not permanent.
+redis_connection = RedisConnection()
+if redis_connection.ping():
+    logger.info("Connected to Redis at %s", settings.REDIS_URL)
+else:
+    logger.warning("Redis at %s is unreachable; it will be retried on later requests.", settings.REDIS_URL)
+
+attach_cache_redis(redis_connection)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    print(f"Starting up {settings.PROJECT_NAME}")
-    print(f"Version: {settings.VERSION}")
-    print(f"Environment: {'Development' if settings.REDIS_URL == 'redis://localhost:6379' else 'Production'}")
+    setup_logging()
+    logger.info(
+        "Starting up %s",
+        settings.PROJECT_NAME,
+        extra={
+            "version": settings.VERSION,
+            "environment": "Development" if settings.REDIS_URL == "redis://localhost:6379" else "Production",
+        },
+    )
     yield
     # Shutdown
-    print("Shutting down...")
-    if redis_client:
-        redis_client.close()
+    logger.info("Shutting down...")
+    redis_connection.close()
+    shutdown_logging()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -52,19 +62,16 @@ async def custom_exception_handler(request: Request, exc: CustomException):
             "error": exc.detail,
             "error_code": exc.error_code,
             "path": str(request.url.path)
-        }
+        },
+        headers=exc.headers
     )
 
+# Requests' unhandled errors are answered by RequestContextMiddleware, which
+# still has their IDs; this only catches errors raised outside it
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    return JSONResponse(
-        status_code=500,
-        content={
-            "error": "Internal server error",
-            "error_code": "INTERNAL_ERROR",
-            "path": str(request.url.path)
-        }
-    )
+    logger.error("Unhandled exception on %s", request.url.path, exc_info=exc)
+    return internal_error_response(request)
 
 # Middleware (order matters!)
 app.add_middleware(
@@ -77,9 +84,11 @@ app.add_middleware(
 
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
 
-# Add rate limiting middleware if Redis is available
-if redis_client:
-    app.add_middleware(RateLimitMiddleware, redis_client=redis_client)
+# Rate limiting (uses Redis when reachable, otherwise the optional local fallback)
+app.add_middleware(RateLimitMiddleware, redis_connection=redis_connection)
+
+# Outermost so every log line, including rate limiting, carries request IDs
+app.add_middleware(RequestContextMiddleware)
 
 # Include routers
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -95,7 +104,8 @@ async def root():
             "Payment processing with Stripe", 
             "Rate limiting",
             "Admin functionality",
-            "Usage tracking"
+            "Usage tracking",
+            "Response caching"
         ]
     }
 
@@ -105,5 +115,5 @@ async def health_check():
     return {
         "status": "healthy",
         "version": settings.VERSION,
-        "redis_connected": redis_client is not None
+        "redis_connected": redis_connection.ping()
     }
\ No newline at end of file
@@ -1,61 +1,88 @@
 import time
-import redis
+import uuid
+from collections import OrderedDict, deque
 from fastapi import Request, HTTPException, status
 from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from app.core.config import settings
-from typing import Optional
+from app.core.logger import get_logger
+from app.core.redis_client import RedisClient, RedisConnection, hash_tag_key
+from typing import Deque, Optional, Tuple
+
+logger = get_logger(__name__)
+
+class LocalRateLimiter:
+    """In-process sliding window used while Redis is unreachable.
+
+    Limits are enforced per worker only, so this is a degradation mode rather
+    than a replacement for the shared Redis counters.
+    """
+    def __init__(self, rate_limit: int, window: int = 60, max_keys: int = 10000):
+        self.rate_limit = rate_limit
+        self.window = window
+        self.max_keys = max_keys
+        self._hits: "OrderedDict[str, Deque[float]]" = OrderedDict()
+
+    def hit(self, key: str, now: float) -> Tuple[bool, int]:
+        """Record a request; return (allowed, requests already in window)"""
+        hits = self._hits.get(key)
+        if hits is None:
+            hits = deque()
+            self._hits[key] = hits
+            while len(self._hits) > self.max_keys:
+                self._hits.popitem(last=False)
+        self._hits.move_to_end(key)
+
+        window_start = now - self.window
+        while hits and hits[0] <= window_start:
+            hits.popleft()
+
+        current_requests = len(hits)
+        if current_requests >= self.rate_limit:
+            return False, current_requests
+
+        hits.append(now)
+        return True, current_requests
 
 class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, redis_client: Optional[redis.Redis] = None):
+    def __init__(self, app, redis_connection: Optional[RedisConnection] = None):
         super().__init__(app)
-        self.redis_client = redis_client
+        self.redis_connection = redis_connection
         self.rate_limit = settings.RATE_LIMIT_PER_MINUTE
-        
+        self.local_limiter = (
+            LocalRateLimiter(self.rate_limit) if settings.RATE_LIMIT_LOCAL_FALLBACK else None
+        )
+
     async def dispatch(self, request: Request, call_next):
-        # Skip rate limiting if Redis is not available
-        if not self.redis_client:
+        # Skip rate limiting if neither Redis nor the local fallback is available
+        if not self.redis_connection and not self.local_limiter:
             return await call_next(request)
-        
+
         # Get client IP
         client_ip = self.get_client_ip(request)
-        
-        # Create rate limit key
-        rate_limit_key = f"rate_limit:{client_ip}"
-        current_time = int(time.time())
-        window_start = current_time - 60  # 1 minute window
-        
-        try:
-            # Clean old entries
-            self.redis_client.zremrangebyscore(rate_limit_key, 0, window_start)
-            
-            # Count current requests
-            current_requests = self.redis_client.zcard(rate_limit_key)
-            
-            # Check if rate limit exceeded
-            if current_requests >= self.rate_limit:
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "error": "Rate limit exceeded",
-                        "detail": f"Maximum {self.rate_limit} requests per minute allowed",
-                        "retry_after": 60
-                    },
-                    headers={"Retry-After": "60"}
-                )
-            
-            # Add current request
-            self.redis_client.zadd(rate_limit_key, {str(current_time): current_time})
-            self.redis_client.expire(rate_limit_key, 60)
-            
-        except Exception as e:
-            # If Redis fails, continue without rate limiting
-            print(f"Rate limiting error: {e}")
-        
+
+        # Hash-tagged so all of a client's keys share one cluster slot
+        rate_limit_key = hash_tag_key("rate_limit", client_ip)
+        now = time.time()
+        current_time = int(now)
+
+        allowed, current_requests = self.check_rate_limit(rate_limit_key, now)
+
+        if allowed is False:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "error": "Rate limit exceeded",
+                    "detail": f"Maximum {self.rate_limit} requests per minute allowed",
+                    "retry_after": 60
+                },
+                headers={"Retry-After": "60"}
+            )
+
         response = await call_next(request)
-        
+
         # Add rate limit headers
-        if self.redis_client:
+        if allowed:
             try:
                 remaining = max(0, self.rate_limit - current_requests - 1)
                 response.headers["X-RateLimit-Limit"] = str(self.rate_limit)
@@ -63,20 +90,60 @@ class RateLimitMiddleware(BaseHTTPMiddleware):
                 response.headers["X-RateLimit-Reset"] = str(current_time + 60)
             except:
                 pass
-        
+
         return response
-    
+
+    def check_rate_limit(self, key: str, now: float) -> Tuple[Optional[bool], int]:
+        """Return (allowed, requests already in window).
+
+        ``allowed`` is None when no limiter could be consulted and the request
+        should pass through without rate limit headers.
+        """
+        redis_client = self.redis_connection.for_key(key) if self.redis_connection else None
+        if redis_client:
+            try:
+                return self.check_redis(redis_client, key, now)
+            except Exception as e:
+                # If Redis fails, degrade to the local limiter (or no limiting)
+                # and stop paying connection timeouts on this node for a while
+                logger.warning("Rate limiting error: %s", e)
+                self.redis_connection.record_failure(key)
+
+        if self.local_limiter:
+            return self.local_limiter.hit(key, now)
+
+        return None, 0
+
+    def check_redis(self, redis_client: RedisClient, key: str, now: float) -> Tuple[bool, int]:
+        """Sliding window check against Redis in a single round trip"""
+        member = f"{now:.6f}:{uuid.uuid4().hex[:8]}"
+
+        # Single-key pipeline, so it is valid on a cluster node as well
+        pipe = redis_client.pipeline()
+        pipe.zremrangebyscore(key, 0, now - 60)
+        pipe.zcard(key)
+        pipe.zadd(key, {member: now})
+        pipe.expire(key, 60)
+        _, current_requests, _, _ = pipe.execute()
+
+        if current_requests >= self.rate_limit:
+            # Rejected requests do not count against the window
+            redis_client.zrem(key, member)
+            return False, current_requests
+
+        return True, current_requests
+
     def get_client_ip(self, request: Request) -> str:
         """Get client IP address from request"""
         # Check for forwarded IP first (for load balancers/proxies)
         forwarded_for = request.headers.get("X-Forwarded-For")
         if forwarded_for:
             return forwarded_for.split(",")[0].strip()
-        
+
         # Check for real IP
         real_ip = request.headers.get("X-Real-IP")
         if real_ip:
             return real_ip
-        
+
         # Fall back to client host
-        return request.client.host if request.client else "unknown"
\ No newline at end of file
+        return request.client.host if request.client else "unknown"
@@ -0,0 +1,49 @@
+import time
+import uuid
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.exceptions import internal_error_response
+from app.core.logger import correlation_id_ctx, get_logger, request_id_ctx
+
+logger = get_logger(__name__)
+access_logger = get_logger("app.access")
+
+class RequestContextMiddleware(BaseHTTPMiddleware):
+    """Assign request/correlation IDs and emit one access log per request"""
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        correlation_id = request.headers.get("X-Correlation-ID") or request_id
+
+        request_token = request_id_ctx.set(request_id)
+        correlation_token = correlation_id_ctx.set(correlation_id)
+        start = time.perf_counter()
+        status_code = 500
+
+        try:
+            try:
+                response = await call_next(request)
+            except Exception:
+                # Handled here rather than by the app-level exception handler,
+                # which runs outside this middleware after the IDs are reset
+                logger.exception("Unhandled exception on %s", request.url.path)
+                response = internal_error_response(request)
+            status_code = response.status_code
+            response.headers["X-Request-ID"] = request_id
+            response.headers["X-Correlation-ID"] = correlation_id
+            return response
+        finally:
+            access_logger.info(
+                "%s %s %s",
+                request.method,
+                request.url.path,
+                status_code,
+                extra={
+                    "method": request.method,
+                    "path": request.url.path,
+                    "status_code": status_code,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                },
+            )
+            request_id_ctx.reset(request_token)
+            correlation_id_ctx.reset(correlation_token)
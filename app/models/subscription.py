@@ -17,6 +17,21 @@ class SubscriptionPlan(str, Enum):
     PREMIUM = "premium"
     ENTERPRISE = "enterprise"
 
+def plan_from_profile(profile: Dict[str, Any]) -> SubscriptionPlan:
+    """Subscription plan stored on a user profile, defaulting to FREE"""
+    try:
+        return SubscriptionPlan(profile.get("subscription_plan", SubscriptionPlan.FREE.value))
+    except ValueError:
+        return SubscriptionPlan.FREE
+
+# Monthly data processing allowance per plan in MB (None = unlimited)
+DATA_PROCESSING_LIMITS_MB: Dict[SubscriptionPlan, Optional[int]] = {
+    SubscriptionPlan.FREE: 100,
+    SubscriptionPlan.BASIC: 1_000,
+    SubscriptionPlan.PREMIUM: 10_000,
+    SubscriptionPlan.ENTERPRISE: None,
+}
+
 class PricingTier(BaseModel):
     name: str
     price_id: str
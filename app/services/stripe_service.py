@@ -1,6 +1,10 @@
 import stripe
+from fastapi.concurrency import run_in_threadpool
 from app.core.config import settings
-from typing import Dict, Any
+from app.core.logger import get_logger
+from typing import Dict, Any, Optional
+
+logger = get_logger(__name__)
 
 # Only initialize if we have Stripe keys
 if settings.STRIPE_SECRET_KEY:
@@ -21,5 +25,35 @@ class StripeService:
             metadata={"user_id": user_id}
         )
         return customer
+    
+    def construct_event(self, payload: bytes, signature: Optional[str]) -> Dict[str, Any]:
+        """Verify a webhook payload's signature and parse the event"""
+        if not self.webhook_secret:
+            raise ValueError("Stripe webhook not configured")
+        if not signature:
+            raise ValueError("Missing Stripe signature")
+        
+        return stripe.Webhook.construct_event(payload, signature, self.webhook_secret)
+    
+    async def get_event_user_id(self, event: Dict[str, Any]) -> Optional[str]:
+        """Resolve our user id from a webhook event's object or its customer"""
+        obj = event["data"]["object"]
+        metadata = obj.get("metadata") or {}
+        if metadata.get("user_id"):
+            return metadata["user_id"]
+        if obj.get("client_reference_id"):
+            return obj["client_reference_id"]
+        
+        customer_id = obj.get("customer")
+        if not customer_id or not settings.STRIPE_SECRET_KEY:
+            return None
+        
+        # Customers are created with our user id in their metadata
+        try:
+            customer = await run_in_threadpool(stripe.Customer.retrieve, customer_id)
+        except stripe.error.StripeError as e:
+            logger.warning("Could not resolve user for Stripe customer %s: %s", customer_id, e)
+            return None
+        return (customer.get("metadata") or {}).get("user_id")
 
 stripe_service = StripeService()
\ No newline at end of file
@@ -1,7 +1,10 @@
 from supabase import create_client, Client
 from app.core.config import settings
+from app.core.logger import get_logger
 from typing import Dict, Any, Optional
 
+logger = get_logger(__name__)
+
 class SupabaseService:
     def __init__(self):
         # Only initialize if we have valid Supabase credentials
@@ -40,5 +43,50 @@ class SupabaseService:
             return response.data
         except Exception:
             return None
+    
+    async def get_usage_total(self, user_id: str, usage_type: str, period: str) -> Optional[int]:
+        """Sum logged usage quantity for a user, usage type and period.
+
+        Summed in the database by the ``get_usage_total`` function (see
+        docs/database-schema.md), read with the service key because RLS hides
+        usage logs from the anon client. Returns None if the total is unknown.
+        """
+        if not self.admin_client:
+            return None
+        try:
+            response = self.admin_client.rpc("get_usage_total", {
+                "p_user_id": user_id,
+                "p_usage_type": usage_type,
+                "p_period": period,
+            }).execute()
+            return int(response.data or 0)
+        except Exception:
+            return None
+    
+    async def log_usage(
+        self,
+        user_id: str,
+        usage_type: str,
+        quantity: int,
+        period: str,
+        endpoint: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Insert a usage log entry (requires the service key)"""
+        if not self.admin_client:
+            return False
+        try:
+            self.admin_client.table("usage_logs").insert({
+                "user_id": user_id,
+                "usage_type": usage_type,
+                "endpoint": endpoint,
+                "quantity": quantity,
+                "metadata": metadata or {},
+                "period": period,
+            }).execute()
+            return True
+        except Exception as e:
+            logger.warning("Usage log insert failed: %s", e)
+            return False
 
 supabase_service = SupabaseService()
\ No newline at end of file
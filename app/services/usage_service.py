@@ -0,0 +1,137 @@
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import Request
+
+from app.core.config import settings
+from app.core.exceptions import PayloadTooLargeError, ServiceUnavailableError, UsageLimitError
+from app.core.logger import get_logger
+from app.models.subscription import DATA_PROCESSING_LIMITS_MB, plan_from_profile
+from app.services.supabase_service import supabase_service
+
+logger = get_logger(__name__)
+
+BYTES_PER_MB = 1024 * 1024
+DATA_PROCESSING_USAGE_TYPE = "data_processing"
+
+class UsageService:
+    def __init__(self):
+        self.max_payload_bytes = settings.DATA_PROCESSING_MAX_PAYLOAD_MB * BYTES_PER_MB
+        # Bytes received by this worker's in-flight uploads and not yet recorded
+        self._reserved: Dict[str, int] = defaultdict(int)
+
+    @staticmethod
+    def current_period() -> str:
+        """Billing period key in "YYYY-MM" format"""
+        return datetime.now(timezone.utc).strftime("%Y-%m")
+
+    async def get_remaining_data_processing_bytes(self, user: Dict[str, Any]) -> Optional[int]:
+        """Bytes the user may still process this period (None = unlimited).
+
+        If usage cannot be read, the request is rejected with
+        ServiceUnavailableError unless DATA_PROCESSING_FAIL_OPEN is set, in
+        which case the full allowance is granted.
+        """
+        plan = plan_from_profile(user.get("profile", {}))
+        limit_mb = DATA_PROCESSING_LIMITS_MB.get(plan)
+        if limit_mb is None:
+            return None
+
+        used_bytes = await supabase_service.get_usage_total(
+            user["id"], DATA_PROCESSING_USAGE_TYPE, self.current_period()
+        )
+        if used_bytes is None:
+            if not settings.DATA_PROCESSING_FAIL_OPEN:
+                raise ServiceUnavailableError(
+                    "Unable to verify data processing quota",
+                    retry_after=settings.CONCURRENCY_RETRY_AFTER_SECONDS,
+                )
+            logger.warning("Data processing usage unavailable; allowing request")
+            used_bytes = 0
+
+        return max(0, limit_mb * BYTES_PER_MB - used_bytes)
+
+    async def stream_metered_body(
+        self, request: Request, user: Dict[str, Any]
+    ) -> AsyncIterator[bytes]:
+        """Yield request body chunks as they arrive, enforcing size and quota limits.
+
+        The body is never buffered in full; the request is rejected as soon as
+        the declared or received size exceeds the maximum payload size or the
+        user's remaining data processing quota.
+
+        Received bytes stay reserved until record_data_processing() is called
+        for them, so concurrent uploads from one user share the remaining
+        quota. Reservations are per worker: uploads running at the same time
+        on different workers can still overshoot it together.
+        """
+        user_id = user["id"]
+        remaining = await self.get_remaining_data_processing_bytes(user)
+
+        declared = request.headers.get("Content-Length")
+        if declared and declared.isdigit():
+            self._check_size(int(declared), self._unreserved(user_id, remaining))
+
+        held = 0
+        try:
+            async for chunk in request.stream():
+                if not chunk:
+                    continue
+                others = self._reserved[user_id] - held
+                self._check_size(held + len(chunk), None if remaining is None else remaining - others)
+                self._reserved[user_id] += len(chunk)
+                held += len(chunk)
+                yield chunk
+        except BaseException:
+            self._release(user_id, held)
+            raise
+
+    async def record_data_processing(
+        self, user_id: str, num_bytes: int, endpoint: Optional[str] = None
+    ) -> bool:
+        """Record processed bytes against the user's data processing usage.
+
+        Releases the bytes reserved by stream_metered_body().
+        """
+        if num_bytes <= 0:
+            return True
+        try:
+            recorded = await supabase_service.log_usage(
+                user_id=user_id,
+                usage_type=DATA_PROCESSING_USAGE_TYPE,
+                quantity=num_bytes,
+                period=self.current_period(),
+                endpoint=endpoint,
+            )
+        finally:
+            self._release(user_id, num_bytes)
+
+        if not recorded:
+            logger.warning(
+                "Failed to record %s data processing bytes for user %s",
+                num_bytes,
+                user_id,
+                extra={"user_id": user_id, "bytes": num_bytes},
+            )
+        return recorded
+
+    def _unreserved(self, user_id: str, remaining: Optional[int]) -> Optional[int]:
+        return None if remaining is None else remaining - self._reserved.get(user_id, 0)
+
+    def _release(self, user_id: str, num_bytes: int) -> None:
+        left = self._reserved.get(user_id, 0) - num_bytes
+        if left > 0:
+            self._reserved[user_id] = left
+        else:
+            self._reserved.pop(user_id, None)
+
+    def _check_size(self, num_bytes: int, remaining: Optional[int]) -> None:
+        if num_bytes > self.max_payload_bytes:
+            raise PayloadTooLargeError(
+                f"Payload exceeds maximum size of {settings.DATA_PROCESSING_MAX_PAYLOAD_MB} MB"
+            )
+        if remaining is not None and num_bytes > remaining:
+            raise UsageLimitError("Data processing quota exceeded for current billing period")
+
+usage_service = UsageService()
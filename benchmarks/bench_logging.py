@@ -0,0 +1,88 @@
+"""Measure the per-request cost of the logging pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_logging
+
+Each figure is the wall time per call on the calling (event loop) thread. For
+the queued paths, formatting and writing happen on the listener thread, which
+runs concurrently and competes for the GIL, so its cost shows up here too.
+"""
+import io
+import logging
+import os
+import queue
+import timeit
+from logging.handlers import QueueListener
+
+from app.core.logger import (
+    ContextFilter,
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+    request_id_ctx,
+)
+
+NUMBER = 50_000
+REPEAT = 5
+
+def best_per_call_us(stmt) -> float:
+    return min(timeit.repeat(stmt, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+
+def make_logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+def access_record(logger: logging.Logger) -> None:
+    logger.info(
+        "%s %s %s",
+        "GET",
+        "/api/v1/auth/profile",
+        200,
+        extra={"method": "GET", "path": "/api/v1/auth/profile", "status_code": 200, "duration_ms": 1.23},
+    )
+
+def main() -> None:
+    devnull = open(os.devnull, "w")
+    output = logging.StreamHandler(devnull)
+    output.setFormatter(JSONFormatter())
+
+    log_queue: queue.Queue = queue.Queue(maxsize=NUMBER * REPEAT * 2)
+    queued = NonBlockingQueueHandler(log_queue)
+    queued.addFilter(ContextFilter())
+    queued.addFilter(RateLimitFilter(window=60, burst=5))
+    listener = QueueListener(log_queue, output)
+    listener.start()
+
+    sync = logging.StreamHandler(io.StringIO())
+    sync.setFormatter(JSONFormatter())
+    sync.addFilter(ContextFilter())
+
+    queued_logger = make_logger("bench.queued", queued)
+    sync_logger = make_logger("bench.sync", sync)
+    request_id_ctx.set("0123456789abcdef0123456789abcdef")
+
+    results = {
+        "print() to devnull (previous behaviour)": best_per_call_us(
+            lambda: print("Rate limiting error: timeout", file=devnull)
+        ),
+        "access record, queued JSON (current)": best_per_call_us(lambda: access_record(queued_logger)),
+        "access record, synchronous JSON": best_per_call_us(lambda: access_record(sync_logger)),
+        "repeated warning, throttled": best_per_call_us(
+            lambda: queued_logger.warning("Rate limiting error: %s", "timeout")
+        ),
+        "debug record below level": best_per_call_us(lambda: queued_logger.debug("ignored %s", 1)),
+    }
+
+    listener.stop()
+    devnull.close()
+
+    width = max(len(name) for name in results)
+    for name, micros in results.items():
+        print(f"{name:<{width}}  {micros:7.2f} us/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import time
+from typing import Any, Dict, Optional
+
+import pytest
+from fastapi.testclient import TestClient
+from jose import jwt
+
+from app.core import cache
+from app.main import app
+from app.services.supabase_service import supabase_service
+
+class FakeSupabase:
+    """Stands in for the Supabase service and counts upstream calls"""
+    def __init__(self):
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.profiles: Dict[str, Dict[str, Any]] = {}
+        self.verify_calls = 0
+        self.profile_calls = 0
+
+    def add_user(self, user_id: str, **profile: Any) -> str:
+        token = jwt.encode({"sub": user_id, "exp": int(time.time()) + 3600}, "secret")
+        self.users[token] = {"id": user_id, "email": f"{user_id}@example.com"}
+        self.profiles[user_id] = {"id": user_id, "full_name": user_id.title(), **profile}
+        return token
+
+    async def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
+        self.verify_calls += 1
+        return self.users.get(token)
+
+    async def get_user_profile(self, user_id: str) -> Optional[Dict[str, Any]]:
+        self.profile_calls += 1
+        profile = self.profiles.get(user_id)
+        return dict(profile) if profile else None
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    for tiered in (cache.token_cache, cache.profile_cache, cache.admission_cache, cache.response_cache):
+        tiered.clear()
+    yield
+    for tiered in (cache.token_cache, cache.profile_cache, cache.admission_cache, cache.response_cache):
+        tiered.clear()
+
+@pytest.fixture
+def fake_supabase(monkeypatch) -> FakeSupabase:
+    fake = FakeSupabase()
+    monkeypatch.setattr(supabase_service, "verify_token", fake.verify_token)
+    monkeypatch.setattr(supabase_service, "get_user_profile", fake.get_user_profile)
+    return fake
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+def auth(token: str) -> Dict[str, str]:
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,162 @@
+import fakeredis
+import stripe
+
+from app.core import cache
+from app.core.config import settings
+from app.core.redis_client import RedisConnection
+from app.services.stripe_service import stripe_service
+from tests.conftest import auth
+
+PROFILE_URL = "/api/v1/auth/profile"
+STATUS_URL = "/api/v1/payments/subscription-status"
+
+class BrokenRedis:
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+    def set(self, *args, **kwargs):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+def test_cache_hit_skips_auth_and_profile_lookups(client, fake_supabase):
+    token = fake_supabase.add_user("alice")
+
+    first = client.get(PROFILE_URL, headers=auth(token))
+    second = client.get(PROFILE_URL, headers=auth(token))
+
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["Cache-Control"] == "private, no-cache"
+    assert second.json() == first.json()
+    assert (fake_supabase.verify_calls, fake_supabase.profile_calls) == (1, 1)
+
+def test_matching_etag_returns_304_without_upstream_calls(client, fake_supabase):
+    token = fake_supabase.add_user("alice")
+    etag = client.get(STATUS_URL, headers=auth(token)).headers["ETag"]
+
+    response = client.get(STATUS_URL, headers={**auth(token), "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert (fake_supabase.verify_calls, fake_supabase.profile_calls) == (1, 1)
+
+def test_etag_is_stable_when_response_is_rebuilt(client, fake_supabase):
+    token = fake_supabase.add_user("alice")
+    etag = client.get(STATUS_URL, headers=auth(token)).headers["ETag"]
+    cache.response_cache.clear()
+
+    response = client.get(STATUS_URL, headers={**auth(token), "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["X-Cache"] == "MISS"
+
+def test_profile_update_invalidates_cached_responses(client, fake_supabase):
+    token = fake_supabase.add_user("alice", subscription_status="free")
+    client.get(STATUS_URL, headers=auth(token))
+
+    fake_supabase.profiles["alice"]["subscription_status"] = "active"
+    client.put(PROFILE_URL, headers=auth(token), json={"full_name": "Alice"})
+    response = client.get(STATUS_URL, headers=auth(token))
+
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["status"] == "active"
+
+def test_subscription_webhook_invalidates_user(client, fake_supabase, monkeypatch):
+    token = fake_supabase.add_user("alice", subscription_status="free")
+    client.get(STATUS_URL, headers=auth(token))
+
+    event = {
+        "type": "customer.subscription.updated",
+        "data": {"object": {"metadata": {"user_id": "alice"}, "customer": "cus_123"}},
+    }
+    monkeypatch.setattr(stripe_service, "construct_event", lambda payload, signature: event)
+    fake_supabase.profiles["alice"]["subscription_status"] = "active"
+
+    webhook = client.post("/api/v1/payments/webhook", content=b"{}", headers={"stripe-signature": "sig"})
+    response = client.get(STATUS_URL, headers=auth(token))
+
+    assert webhook.status_code == 200
+    assert response.json()["status"] == "active"
+
+def test_webhook_survives_stripe_errors_resolving_customer(client, monkeypatch):
+    event = {"type": "customer.subscription.updated", "data": {"object": {"customer": "cus_123"}}}
+    monkeypatch.setattr(stripe_service, "construct_event", lambda payload, signature: event)
+    monkeypatch.setattr(settings, "STRIPE_SECRET_KEY", "sk_test")
+
+    def retrieve(customer_id):
+        raise stripe.error.APIConnectionError("stripe down")
+
+    monkeypatch.setattr(stripe.Customer, "retrieve", retrieve)
+
+    response = client.post("/api/v1/payments/webhook", content=b"{}", headers={"stripe-signature": "sig"})
+
+    assert response.status_code == 200
+
+def test_webhook_rejects_unverified_payload(client):
+    response = client.post("/api/v1/payments/webhook", content=b"{}")
+
+    assert response.status_code == 400
+
+def test_cached_responses_are_per_user(client, fake_supabase):
+    alice = fake_supabase.add_user("alice", subscription_status="free")
+    bob = fake_supabase.add_user("bob", subscription_status="active")
+
+    client.get(STATUS_URL, headers=auth(alice))
+    response = client.get(STATUS_URL, headers=auth(bob))
+
+    assert response.json()["status"] == "active"
+
+def test_profile_is_shared_through_redis_tier():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    tiered = cache.TieredCache(ttl=60, memory_ttl=5, max_entries=10)
+    tiered.attach_redis(RedisConnection(factory=lambda: redis))
+    key = cache.profile_cache_key("alice")
+
+    tiered.set(key, {"id": "alice", "subscription_plan": "premium"})
+    tiered.clear()
+
+    assert tiered.get(key) == {"id": "alice", "subscription_plan": "premium"}
+    assert redis.ttl(key) > 5
+
+def test_responses_are_shared_through_redis_and_invalidated(client, fake_supabase, monkeypatch):
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(cache.response_cache, "redis", RedisConnection(factory=lambda: redis))
+    token = fake_supabase.add_user("alice", subscription_status="free")
+
+    first = client.get(STATUS_URL, headers=auth(token))
+    # Another worker has nothing in memory but finds the response in Redis
+    cache.response_cache.clear()
+    second = client.get(STATUS_URL, headers=auth(token))
+
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert redis.ttl(cache.response_cache_key("alice", "payments:subscription-status")) > 5
+
+    fake_supabase.profiles["alice"]["subscription_status"] = "active"
+    client.put(PROFILE_URL, headers=auth(token), json={"full_name": "Alice"})
+    cache.response_cache.clear()
+
+    assert client.get(STATUS_URL, headers=auth(token)).json()["status"] == "active"
+
+def test_redis_outage_trips_breaker_instead_of_every_lookup():
+    broken = BrokenRedis()
+    tiered = cache.TieredCache(ttl=60, memory_ttl=5, max_entries=10)
+    tiered.attach_redis(RedisConnection(factory=lambda: broken, retry_seconds=60))
+
+    for _ in range(5):
+        assert tiered.get(cache.profile_cache_key("alice")) is None
+
+    assert broken.calls == 1
+
+def test_memory_tier_is_bounded():
+    tiered = cache.TieredCache(ttl=60, memory_ttl=60, max_entries=2)
+
+    for name in ("a", "b", "c"):
+        tiered.set(name, name)
+
+    assert tiered.get("a") is None
+    assert tiered.get("c") == "c"
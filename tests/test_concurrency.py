@@ -0,0 +1,222 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+from jose import jwt
+
+from app.core import cache
+from app.core import concurrency as concurrency_module
+from app.core.concurrency import AdaptiveConcurrencyLimiter, concurrency_limiter
+from app.core.config import settings
+from app.core.deps import admission_plan
+from app.core.exceptions import ServiceUnavailableError
+from app.core.redis_client import RedisConnection
+from app.models.subscription import SubscriptionPlan
+from tests.conftest import auth
+
+def make_limiter(**overrides) -> AdaptiveConcurrencyLimiter:
+    options = dict(
+        initial_limit=1,
+        min_limit=1,
+        max_limit=10,
+        target_latency=1.0,
+        backoff=0.5,
+        max_wait=1.0,
+        retry_after=7,
+    )
+    options.update(overrides)
+    return AdaptiveConcurrencyLimiter(**options)
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(concurrency_module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_queued_requests_are_served_by_plan_priority():
+    async def scenario():
+        limiter = make_limiter()
+        await limiter.acquire(SubscriptionPlan.ENTERPRISE)
+        served = []
+
+        async def request(plan):
+            await limiter.acquire(plan)
+            served.append(plan)
+            limiter.release(0.0)
+
+        tasks = [
+            asyncio.create_task(request(plan))
+            for plan in (SubscriptionPlan.FREE, SubscriptionPlan.PREMIUM, SubscriptionPlan.ENTERPRISE)
+        ]
+        await asyncio.sleep(0)
+        limiter.release(0.0)
+        await asyncio.gather(*tasks)
+        return served, limiter.in_flight
+
+    served, in_flight = asyncio.run(scenario())
+
+    assert served == [SubscriptionPlan.ENTERPRISE, SubscriptionPlan.PREMIUM, SubscriptionPlan.FREE]
+    assert in_flight == 0
+
+def test_free_requests_are_shed_when_their_queue_is_full():
+    async def scenario():
+        limiter = make_limiter(max_wait=5.0)
+        await limiter.acquire(SubscriptionPlan.ENTERPRISE)
+        queued = [asyncio.create_task(limiter.acquire(SubscriptionPlan.FREE)) for _ in range(5)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(ServiceUnavailableError) as shed:
+            await limiter.acquire(SubscriptionPlan.FREE)
+        # Paying plans still queue behind a full free queue
+        premium = asyncio.create_task(limiter.acquire(SubscriptionPlan.PREMIUM))
+        await asyncio.sleep(0)
+        assert not premium.done()
+
+        for task in queued + [premium]:
+            task.cancel()
+        await asyncio.gather(*queued, premium, return_exceptions=True)
+        return shed.value
+
+    error = asyncio.run(scenario())
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "7"
+
+def test_request_is_shed_after_waiting_too_long():
+    async def scenario():
+        limiter = make_limiter(max_wait=0.01)
+        await limiter.acquire(SubscriptionPlan.ENTERPRISE)
+        with pytest.raises(ServiceUnavailableError):
+            await limiter.acquire(SubscriptionPlan.PREMIUM)
+        return limiter
+
+    limiter = asyncio.run(scenario())
+
+    assert limiter.in_flight == 1
+    assert not any(limiter._queues.values())
+
+def test_limit_grows_on_fast_requests_and_backs_off_on_slow_ones(clock):
+    limiter = make_limiter(initial_limit=4, min_limit=2)
+
+    for _ in range(4):
+        limiter.in_flight += 1
+        limiter.release(0.1)
+    assert limiter.limit == pytest.approx(5.0, abs=0.1)
+
+    limiter.in_flight += 2
+    limiter.release(2.0)
+    limiter.release(2.0, failed=True)
+    # Only one decrease per target latency
+    assert limiter.limit == pytest.approx(2.5, abs=0.1)
+
+    clock[0] += 1.0
+    limiter.in_flight += 1
+    limiter.release(0.0, failed=True)
+    assert limiter.limit == 2.0
+    assert limiter.in_flight == 0
+
+def test_client_bound_requests_do_not_adapt_the_limit(clock):
+    limiter = make_limiter(initial_limit=4)
+
+    async def scenario():
+        async with limiter.slot(SubscriptionPlan.FREE) as ticket:
+            clock[0] += 30.0
+            ticket.adaptive = False
+
+    asyncio.run(scenario())
+
+    assert limiter.limit == 4.0
+    assert limiter.in_flight == 0
+
+def test_cancelled_requests_release_their_slot():
+    async def scenario():
+        limiter = make_limiter()
+        entered = asyncio.Event()
+
+        async def request():
+            async with limiter.slot(SubscriptionPlan.PREMIUM):
+                entered.set()
+                await asyncio.sleep(10)
+
+        running = asyncio.create_task(request())
+        await entered.wait()
+        waiting = asyncio.create_task(request())
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        running.cancel()
+        await asyncio.gather(running, waiting, return_exceptions=True)
+        return limiter
+
+    limiter = asyncio.run(scenario())
+
+    assert limiter.in_flight == 0
+    assert not any(limiter._queues.values())
+
+def test_granted_slot_is_handed_on_when_waiter_is_cancelled():
+    async def scenario():
+        limiter = make_limiter()
+        await limiter.acquire(SubscriptionPlan.PREMIUM)
+        first = asyncio.create_task(limiter.acquire(SubscriptionPlan.PREMIUM))
+        second = asyncio.create_task(limiter.acquire(SubscriptionPlan.PREMIUM))
+        await asyncio.sleep(0)
+
+        # The slot goes to the first waiter, which is cancelled before it runs
+        limiter.release(0.0, adaptive=False)
+        first.cancel()
+        await asyncio.wait([first, second], timeout=0.1)
+        holders = [task for task in (first, second) if task.done() and not task.cancelled()]
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        return holders, limiter
+
+    holders, limiter = asyncio.run(scenario())
+
+    # Either the first waiter keeps the slot or it is handed on, never both
+    assert len(holders) == 1
+    assert limiter.in_flight == 1
+
+def test_shed_request_gets_retry_after_without_reaching_supabase(client, fake_supabase, monkeypatch):
+    token = fake_supabase.add_user("alice", subscription_plan="free")
+
+    async def acquire(plan):
+        raise concurrency_limiter._shed(plan)
+
+    monkeypatch.setattr(concurrency_limiter, "acquire", acquire)
+
+    response = client.get("/api/v1/protected/free-feature", headers=auth(token))
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(settings.CONCURRENCY_RETRY_AFTER_SECONDS)
+    assert fake_supabase.verify_calls == 0
+    assert fake_supabase.profile_calls == 0
+
+def test_admission_plan_outlives_memory_auth_cache(client, fake_supabase, monkeypatch):
+    token = fake_supabase.add_user("alice", subscription_plan="enterprise")
+    assert admission_plan(token) == SubscriptionPlan.FREE
+
+    client.get("/api/v1/protected/free-feature", headers=auth(token))
+    later = time.monotonic() + settings.RESPONSE_CACHE_MEMORY_TTL_SECONDS + 1
+    monkeypatch.setattr(cache.time, "monotonic", lambda: later)
+
+    assert cache.token_cache.peek(cache.token_cache_key(token)) is None
+    assert admission_plan(token) == SubscriptionPlan.ENTERPRISE
+
+def test_admission_plan_is_shared_with_other_workers(client, fake_supabase, monkeypatch):
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(cache.admission_cache, "redis", RedisConnection(factory=lambda: redis))
+    token = fake_supabase.add_user("alice", subscription_plan="premium")
+
+    client.get("/api/v1/protected/free-feature", headers=auth(token))
+    # A worker that has never seen the token only has Redis to go on
+    cache.admission_cache.clear()
+
+    assert admission_plan(token) == SubscriptionPlan.PREMIUM
+
+def test_admission_plan_comes_from_verified_jwt_claims(monkeypatch):
+    monkeypatch.setattr(settings, "SUPABASE_JWT_SECRET", "jwt-secret")
+    claims = {"sub": "alice", "app_metadata": {"subscription_plan": "enterprise"}}
+
+    assert admission_plan(jwt.encode(claims, "jwt-secret")) == SubscriptionPlan.ENTERPRISE
+    assert admission_plan(jwt.encode(claims, "forged")) == SubscriptionPlan.FREE
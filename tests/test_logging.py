@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.logger import (
+    ContextFilter,
+    JSONFormatter,
+    NonBlockingQueueHandler,
+    RateLimitFilter,
+)
+from app.main import general_exception_handler
+from app.middleware.request_context import RequestContextMiddleware
+
+class CaptureHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.addFilter(ContextFilter())
+
+    def emit(self, record):
+        self.records.append(record)
+
+@pytest.fixture
+def captured():
+    handler = CaptureHandler()
+    app_logger = logging.getLogger("app")
+    app_logger.addHandler(handler)
+    yield handler.records
+    app_logger.removeHandler(handler)
+
+def make_record(msg="Redis down: %s", args=("timeout",), level=logging.WARNING):
+    return logging.LogRecord("app.test", level, __file__, 1, msg, args, None)
+
+def test_unhandled_exception_is_logged_with_request_ids(captured):
+    app = FastAPI()
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    response = TestClient(app).get("/boom", headers={"X-Correlation-ID": "corr-1"})
+
+    assert response.status_code == 500
+    assert response.json()["error_code"] == "INTERNAL_ERROR"
+    request_id = response.headers["X-Request-ID"]
+    assert response.headers["X-Correlation-ID"] == "corr-1"
+
+    error = next(record for record in captured if record.levelno == logging.ERROR)
+    assert error.exc_info[0] is RuntimeError
+    assert (error.request_id, error.correlation_id) == (request_id, "corr-1")
+
+    access = next(record for record in captured if record.name == "app.access")
+    assert access.status_code == 500
+    assert access.request_id == request_id
+
+def test_app_level_handler_matches_middleware_error_body():
+    request = Request({"type": "http", "method": "GET", "path": "/boom", "headers": [], "query_string": b""})
+
+    response = asyncio.run(general_exception_handler(request, RuntimeError("boom")))
+
+    assert response.status_code == 500
+    assert json.loads(response.body) == {
+        "error": "Internal server error",
+        "error_code": "INTERNAL_ERROR",
+        "path": "/boom",
+    }
+
+def test_rate_limit_filter_suppresses_repeats_and_reports_count():
+    log_filter = RateLimitFilter(window=60, burst=2)
+
+    passed = [log_filter.filter(make_record()) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+
+    # Expire the window and check the next record carries the suppressed count
+    for bucket in log_filter._buckets.values():
+        bucket[0] -= 61
+    record = make_record()
+    assert log_filter.filter(record)
+    assert record.suppressed == 3
+
+def test_rate_limit_filter_ignores_info_records():
+    log_filter = RateLimitFilter(window=60, burst=1)
+
+    assert all(log_filter.filter(make_record(level=logging.INFO)) for _ in range(5))
+
+def test_dropped_records_are_reported_on_next_record():
+    log_queue = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(log_queue)
+
+    for _ in range(3):
+        handler.handle(make_record())
+    assert handler.dropped == 2
+
+    log_queue.get_nowait()
+    handler.handle(make_record())
+
+    assert log_queue.get_nowait().dropped_records == 2
+    assert handler.dropped == 0
+
+def test_queued_record_renders_message_and_exception_as_json():
+    log_queue = queue.Queue()
+    handler = NonBlockingQueueHandler(log_queue)
+    try:
+        raise ValueError("bad")
+    except ValueError:
+        record = logging.LogRecord("app.test", logging.ERROR, __file__, 1, "failed %s", ("x",), None)
+        record.exc_info = sys.exc_info()
+    record.user_id = "alice"
+    handler.handle(record)
+
+    payload = json.loads(JSONFormatter().format(log_queue.get_nowait()))
+
+    assert payload["message"] == "failed x"
+    assert payload["user_id"] == "alice"
+    assert "ValueError: bad" in payload["exception"]
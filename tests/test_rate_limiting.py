@@ -0,0 +1,192 @@
+import fakeredis
+import pytest
+from redis.crc import key_slot
+
+from app.core import redis_client as redis_client_module
+from app.core.cache import response_cache_key
+from app.core.redis_client import RedisConnection, hash_tag_key
+from app.middleware.rate_limiting import LocalRateLimiter, RateLimitMiddleware
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class Node:
+    def __init__(self, name: str):
+        self.name = name
+
+class FakeClusterClient(fakeredis.FakeRedis):
+    """Routes keys to two named nodes and fails on the ones marked down"""
+    down: set = set()
+
+    def get_node_from_key(self, key):
+        return Node("node-a" if key_slot(key.encode()) < 8192 else "node-b")
+
+    def pipeline(self, *args, **kwargs):
+        return FakeClusterPipeline(self, super().pipeline(*args, **kwargs))
+
+class FakeClusterPipeline:
+    def __init__(self, client, pipe):
+        self.client = client
+        self.pipe = pipe
+        self.keys = []
+
+    def __getattr__(self, name):
+        command = getattr(self.pipe, name)
+
+        def queue(key, *args, **kwargs):
+            self.keys.append(key)
+            return command(key, *args, **kwargs)
+        return queue
+
+    def execute(self):
+        if any(self.client.get_node_from_key(key).name in self.client.down for key in self.keys):
+            raise ConnectionError("node down")
+        return self.pipe.execute()
+
+class BrokenClient:
+    def __init__(self):
+        self.calls = 0
+
+    def pipeline(self):
+        self.calls += 1
+        raise ConnectionError("redis down")
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(redis_client_module.time, "monotonic", clock)
+    return clock
+
+def make_limiter(connection=None, local_fallback=False, rate_limit=3):
+    limiter = RateLimitMiddleware(app=None, redis_connection=connection)
+    limiter.rate_limit = rate_limit
+    limiter.local_limiter = LocalRateLimiter(rate_limit) if local_fallback else None
+    return limiter
+
+def test_hash_tag_key_pins_slot_to_tag():
+    key = hash_tag_key("rate_limit", "203.0.113.7")
+    assert key == "rate_limit:{203.0.113.7}"
+    assert key_slot(key.encode()) == key_slot(b"203.0.113.7")
+
+def test_hash_tag_key_strips_braces_from_tag():
+    assert hash_tag_key("rate_limit", "a{b}c") == "rate_limit:{abc}"
+
+def test_response_cache_keys_for_one_user_share_a_slot():
+    slots = {
+        key_slot(response_cache_key("user-1", namespace).encode())
+        for namespace in ("auth:profile", "payments:subscription-status", "protected:premium-feature")
+    }
+    assert len(slots) == 1
+
+def test_redis_sliding_window_allows_up_to_limit():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    limiter = make_limiter(RedisConnection(factory=lambda: redis))
+    key = hash_tag_key("rate_limit", "client")
+
+    results = [limiter.check_rate_limit(key, 100.0 + i * 0.001) for i in range(5)]
+
+    assert results == [(True, 0), (True, 1), (True, 2), (False, 3), (False, 3)]
+
+def test_rejected_requests_are_removed_from_window():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    limiter = make_limiter(RedisConnection(factory=lambda: redis))
+    key = hash_tag_key("rate_limit", "client")
+
+    for i in range(10):
+        limiter.check_rate_limit(key, 100.0 + i * 0.001)
+
+    assert redis.zcard(key) == 3
+    assert redis.ttl(key) > 0
+
+def test_requests_in_same_second_are_counted_separately():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    limiter = make_limiter(RedisConnection(factory=lambda: redis))
+    key = hash_tag_key("rate_limit", "client")
+
+    limiter.check_rate_limit(key, 100.0)
+    limiter.check_rate_limit(key, 100.0)
+
+    assert redis.zcard(key) == 2
+
+def test_window_slides_after_a_minute():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    limiter = make_limiter(RedisConnection(factory=lambda: redis))
+    key = hash_tag_key("rate_limit", "client")
+
+    for i in range(3):
+        limiter.check_rate_limit(key, 100.0 + i)
+
+    assert limiter.check_rate_limit(key, 130.0)[0] is False
+    assert limiter.check_rate_limit(key, 161.5) == (True, 1)
+
+def test_redis_failure_switches_to_local_limiter(clock):
+    broken = BrokenClient()
+    limiter = make_limiter(RedisConnection(factory=lambda: broken, retry_seconds=5), local_fallback=True)
+    key = hash_tag_key("rate_limit", "client")
+
+    results = [limiter.check_rate_limit(key, 100.0 + i) for i in range(4)]
+
+    assert [allowed for allowed, _ in results] == [True, True, True, False]
+    # The breaker tripped on the first failure, so Redis was not retried
+    assert broken.calls == 1
+
+def test_redis_is_retried_after_retry_window(clock):
+    broken = BrokenClient()
+    limiter = make_limiter(RedisConnection(factory=lambda: broken, retry_seconds=5), local_fallback=True)
+    key = hash_tag_key("rate_limit", "client")
+
+    limiter.check_rate_limit(key, 100.0)
+    clock.now += 4
+    limiter.check_rate_limit(key, 101.0)
+    assert broken.calls == 1
+
+    clock.now += 2
+    limiter.check_rate_limit(key, 102.0)
+    assert broken.calls == 2
+
+def test_redis_failure_without_fallback_passes_through(clock):
+    limiter = make_limiter(RedisConnection(factory=BrokenClient))
+
+    assert limiter.check_rate_limit(hash_tag_key("rate_limit", "client"), 100.0) == (None, 0)
+
+def test_redis_down_at_startup_is_retried(clock):
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    attempts = []
+
+    def factory():
+        attempts.append(clock.now)
+        if len(attempts) == 1:
+            raise ConnectionError("cluster seed nodes unreachable")
+        return redis
+
+    connection = RedisConnection(factory=factory, retry_seconds=5)
+    assert connection.client is None
+    assert connection.client is None
+    assert len(attempts) == 1
+
+    clock.now += 5
+    assert connection.client is redis
+
+def test_unreachable_shard_only_degrades_its_keys(clock):
+    client = FakeClusterClient(decode_responses=True)
+    client.down = {"node-a"}
+    connection = RedisConnection(factory=lambda: client, retry_seconds=5)
+    limiter = make_limiter(connection, local_fallback=True)
+
+    assert connection.client is client
+    keys = {}
+    for i in range(100):
+        key = hash_tag_key("rate_limit", f"client-{i}")
+        keys.setdefault(connection.node_for_key(key), key)
+    key_a, key_b = keys["node-a"], keys["node-b"]
+
+    limiter.check_rate_limit(key_a, 100.0)
+    limiter.check_rate_limit(key_b, 100.0)
+
+    assert connection.for_key(key_a) is None
+    assert connection.for_key(key_b) is client
+    assert client.zcard(key_b) == 1
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+
+import pytest
+
+from app.core.config import settings
+from app.core.exceptions import ServiceUnavailableError, UsageLimitError
+from app.services.supabase_service import supabase_service
+from app.services.usage_service import BYTES_PER_MB, usage_service
+from tests.conftest import auth
+
+FEATURE_URL = "/api/v1/protected/usage-tracked-feature"
+
+class FakeRPC:
+    def __init__(self, data=None, error=None):
+        self.data = data
+        self.error = error
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return self
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return self
+
+@pytest.fixture
+def usage_log(monkeypatch):
+    logged = []
+
+    async def log_usage(**kwargs):
+        logged.append(kwargs)
+        return True
+
+    monkeypatch.setattr(supabase_service, "log_usage", log_usage)
+    return logged
+
+def set_used_bytes(monkeypatch, used_bytes):
+    async def get_usage_total(user_id, usage_type, period):
+        return used_bytes
+
+    monkeypatch.setattr(supabase_service, "get_usage_total", get_usage_total)
+
+def test_usage_total_is_summed_by_database_with_service_key(monkeypatch):
+    admin = FakeRPC(data=12345)
+    monkeypatch.setattr(supabase_service, "admin_client", admin)
+
+    total = asyncio.run(supabase_service.get_usage_total("alice", "data_processing", "2026-10"))
+
+    assert total == 12345
+    assert admin.calls == [(
+        "get_usage_total",
+        {"p_user_id": "alice", "p_usage_type": "data_processing", "p_period": "2026-10"},
+    )]
+
+def test_usage_total_is_unknown_on_error(monkeypatch):
+    monkeypatch.setattr(supabase_service, "admin_client", FakeRPC(error=RuntimeError("timeout")))
+
+    assert asyncio.run(supabase_service.get_usage_total("alice", "data_processing", "2026-10")) is None
+
+def test_usage_total_is_unknown_without_service_key(monkeypatch):
+    monkeypatch.setattr(supabase_service, "admin_client", None)
+
+    assert asyncio.run(supabase_service.get_usage_total("alice", "data_processing", "2026-10")) is None
+
+def test_unknown_usage_fails_closed_by_default(monkeypatch):
+    set_used_bytes(monkeypatch, None)
+    user = {"id": "alice", "profile": {"subscription_plan": "free"}}
+
+    with pytest.raises(ServiceUnavailableError):
+        asyncio.run(usage_service.get_remaining_data_processing_bytes(user))
+
+def test_unknown_usage_can_fail_open(monkeypatch):
+    set_used_bytes(monkeypatch, None)
+    monkeypatch.setattr(settings, "DATA_PROCESSING_FAIL_OPEN", True)
+    user = {"id": "alice", "profile": {"subscription_plan": "free"}}
+
+    remaining = asyncio.run(usage_service.get_remaining_data_processing_bytes(user))
+
+    assert remaining == 100 * BYTES_PER_MB
+
+def test_unlimited_plan_skips_usage_lookup(monkeypatch):
+    set_used_bytes(monkeypatch, None)
+    user = {"id": "alice", "profile": {"subscription_plan": "enterprise"}}
+
+    assert asyncio.run(usage_service.get_remaining_data_processing_bytes(user)) is None
+
+class FakeUpload:
+    """Request stand-in whose body arrives in the given chunks"""
+    def __init__(self, *chunks):
+        self.headers = {}
+        self.chunks = chunks
+
+    async def stream(self):
+        for chunk in self.chunks:
+            yield chunk
+
+async def consume(body):
+    return sum([len(chunk) async for chunk in body])
+
+def test_concurrent_uploads_share_remaining_quota(monkeypatch):
+    set_used_bytes(monkeypatch, 100 * BYTES_PER_MB - 100)
+    user = {"id": "alice", "profile": {"subscription_plan": "free"}}
+
+    async def scenario():
+        first = usage_service.stream_metered_body(FakeUpload(b"x" * 60), user)
+        assert await consume(first) == 60
+        # The first upload is not recorded yet, so only 40 bytes are left
+        with pytest.raises(UsageLimitError):
+            await consume(usage_service.stream_metered_body(FakeUpload(b"x" * 30, b"x" * 30), user))
+        await usage_service.record_data_processing("alice", 60)
+
+    asyncio.run(scenario())
+
+    assert usage_service._reserved == {}
+
+def test_failed_usage_log_is_reported(monkeypatch, caplog):
+    async def log_usage(**kwargs):
+        return False
+
+    monkeypatch.setattr(supabase_service, "log_usage", log_usage)
+
+    with caplog.at_level(logging.WARNING, logger="app"):
+        recorded = asyncio.run(usage_service.record_data_processing("alice", 4096))
+
+    assert recorded is False
+    record = next(r for r in caplog.records if r.name == "app.services.usage_service")
+    assert (record.user_id, record.bytes) == ("alice", 4096)
+
+def test_streamed_bytes_are_metered(client, fake_supabase, usage_log, monkeypatch):
+    token = fake_supabase.add_user("alice", subscription_plan="free")
+    set_used_bytes(monkeypatch, 0)
+
+    def body():
+        for _ in range(4):
+            yield b"x" * 1024
+
+    response = client.post(FEATURE_URL, headers=auth(token), content=body())
+
+    assert response.status_code == 200
+    assert response.json()["result"]["bytes_processed"] == 4096
+    assert "input_data" not in response.json()["result"]
+    assert usage_log[0]["quantity"] == 4096
+
+def test_upload_over_remaining_quota_is_rejected(client, fake_supabase, usage_log, monkeypatch):
+    token = fake_supabase.add_user("alice", subscription_plan="free")
+    set_used_bytes(monkeypatch, 100 * BYTES_PER_MB - 10)
+
+    response = client.post(FEATURE_URL, headers=auth(token), content=b"x" * 11)
+
+    assert response.status_code == 429
+    assert usage_log == []
+
+def test_upload_over_maximum_size_is_rejected(client, fake_supabase, usage_log, monkeypatch):
+    token = fake_supabase.add_user("alice", subscription_plan="enterprise")
+    monkeypatch.setattr(usage_service, "max_payload_bytes", 10)
+
+    response = client.post(FEATURE_URL, headers=auth(token), content=b"x" * 11)
+
+    assert response.status_code == 413
+    assert usage_log == []